@@ -3,64 +3,433 @@ from openalgo import api
 from dotenv import load_dotenv
 import os
 import sys
+import asyncio
+import functools
 from pathlib import Path
-from starlette.applications import Starlette
-from starlette.routing import Mount
-import uvicorn
 import logging
 import argparse
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import orjson
+from typing import Annotated, Literal, NamedTuple, Optional
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, TypeAdapter
+from cachetools import TTLCache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-# Find and load the common .env file from the parent directory
-parent_dir = Path(__file__).resolve().parent.parent
-env_path = parent_dir / ".env"
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path)
-    logging.info(f"Loaded environment from {env_path}")
-else:
-    load_dotenv()  # Fall back to local .env file if common one doesn't exist
-    logging.info("Loaded environment from local .env file")
-
-# Parse command line arguments
-parser = argparse.ArgumentParser(description='OpenAlgo MCP Server')
-parser.add_argument('--api-key', help='OpenAlgo API Key')
-parser.add_argument('--host', default='http://127.0.0.1:5000', help='OpenAlgo API host (default: http://127.0.0.1:5000)')
-parser.add_argument('--port', type=int, default=8001, help='Server port (default: 8001)')
-parser.add_argument('--mode', choices=['stdio', 'sse'], default='sse', help='Server mode (default: sse)')
-args = parser.parse_args()
-
-# Get configuration from environment variables or command line arguments
-API_KEY = os.getenv('OPENALGO_API_KEY') or args.api_key
-API_HOST = os.getenv('OPENALGO_API_HOST', args.host)
-PORT = int(os.getenv('SERVER_PORT', str(args.port)))
-MODE = os.getenv('SERVER_MODE', args.mode)
-DEBUG = os.getenv('SERVER_DEBUG', '').lower() in ('true', 'yes', '1')
+# Set up detailed logging for OpenAlgo API requests
+class APIDebugHandler(logging.Handler):
+    def emit(self, record):
+        print(f"[{record.levelname}] {record.getMessage()}")
+
+class JSONFormatter(logging.Formatter):
+    """Render a record as one JSON object per line for log shippers."""
+
+    def format(self, record):
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode()
+
+# Configure logging. Records are queued and written by a background thread so console
+# writes never block the event loop; each output handler filters by its own level.
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, console_handler, APIDebugHandler(logging.INFO), respect_handler_level=True)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
+# The server's own records go straight onto the queue instead of also walking up to root
+logger = logging.getLogger("openalgo.mcp")
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+log_listener.start()
+# Stopped at interpreter exit rather than in the ASGI lifespan, so uvicorn's own
+# shutdown messages after the lifespan ends are still written
+atexit.register(log_listener.stop)
+
+class Config(NamedTuple):
+    api_key: Optional[str]
+    api_host: str
+    port: int
+    mode: str
+    debug: bool
+    reload: bool
+    backlog: int
+    max_rows: int
+    log_format: str
+    basket_chunk: int
+    thread_pool: int
+
+@functools.lru_cache(maxsize=1)
+def _config():
+    """Load .env and command line arguments once and resolve the server settings."""
+    # Find and load the common .env file from the parent directory
+    parent_dir = Path(__file__).resolve().parent.parent
+    env_path = parent_dir / ".env"
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path)
+        logger.info("Loaded environment from %s", env_path)
+    else:
+        load_dotenv()  # Fall back to local .env file if common one doesn't exist
+        logger.info("Loaded environment from local .env file")
+
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description='OpenAlgo MCP Server')
+    parser.add_argument('--api-key', help='OpenAlgo API Key')
+    parser.add_argument('--host', default='http://127.0.0.1:5000', help='OpenAlgo API host (default: http://127.0.0.1:5000)')
+    parser.add_argument('--port', type=int, default=8001, help='Server port (default: 8001)')
+    parser.add_argument('--mode', choices=['stdio', 'sse'], default='sse', help='Server mode (default: sse)')
+    args = parser.parse_args()
+
+    # Get configuration from environment variables or command line arguments
+    return Config(
+        api_key=os.getenv('OPENALGO_API_KEY') or args.api_key,
+        api_host=os.getenv('OPENALGO_API_HOST', args.host),
+        port=int(os.getenv('SERVER_PORT', str(args.port))),
+        mode=os.getenv('SERVER_MODE', args.mode),
+        debug=os.getenv('SERVER_DEBUG', '').lower() in ('true', 'yes', '1'),
+        reload=os.getenv('SERVER_RELOAD', '').lower() in ('true', 'yes', '1'),
+        backlog=int(os.getenv('SERVER_BACKLOG', '2048')),
+        max_rows=int(os.getenv('SERVER_MAX_ROWS', '5000')),
+        log_format=os.getenv('SERVER_LOG_FORMAT', 'text').lower(),
+        basket_chunk=max(0, int(os.getenv('SERVER_BASKET_CHUNK', '0'))),
+        thread_pool=max(1, int(os.getenv('SERVER_THREAD_POOL', '128'))),
+    )
+
+API_KEY, API_HOST, PORT, MODE, DEBUG, RELOAD, BACKLOG, MAX_ROWS, LOG_FORMAT, BASKET_CHUNK, THREAD_POOL = _config()
+
+if LOG_FORMAT == 'json':
+    # Formatting happens on the listener thread, so this costs the tools nothing
+    console_handler.setFormatter(JSONFormatter())
+
+if DEBUG:
+    # Per-call request/response echoes are only logged in debug mode
+    logger.setLevel(logging.DEBUG)
 
 if not API_KEY:
     raise ValueError("OPENALGO_API_KEY must be set either in .env file or via command line arguments")
 
-# Set up detailed logging for OpenAlgo API requests
-class APIDebugHandler(logging.Handler):
-    def emit(self, record):
-        if record.levelno >= logging.INFO:
-            print(f"[{record.levelname}] {record.getMessage()}")
+def _transport_error(exc):
+    """Map an httpx failure to the error dict the OpenAlgo SDK returns for it."""
+    if isinstance(exc, httpx.TimeoutException):
+        return {
+            'status': 'error',
+            'message': 'Request timed out. The server took too long to respond.',
+            'error_type': 'timeout_error'
+        }
+    if isinstance(exc, httpx.ConnectError):
+        return {
+            'status': 'error',
+            'message': 'Failed to connect to the server. Please check if the server is running.',
+            'error_type': 'connection_error'
+        }
+    return {
+        'status': 'error',
+        'message': f'HTTP error occurred: {str(exc)}',
+        'error_type': 'http_error'
+    }
+
+class OpenAlgoClient(api):
+    """
+    OpenAlgo SDK client that sends its API calls over one shared HTTP connection pool.
 
-logger = logging.getLogger()
-logger.addHandler(APIDebugHandler())
+    The SDK opens a fresh connection for each call; routing `_make_request` through a
+    long-lived httpx.Client lets concurrent tool calls reuse keep-alive (and, over TLS,
+    multiplexed HTTP/2) connections to the OpenAlgo backend. Failed connection attempts
+    are retried by the transport; requests that reached the server are never resent.
+
+    This relies on the SDK's internal `_make_request`/`_handle_response` hooks, hence
+    the exact openalgo pin in requirements.txt. instruments() bypasses them with its own
+    httpx.get, so that endpoint still opens a connection per call.
+    """
+
+    def __init__(self, api_key, host, **kwargs):
+        super().__init__(api_key=api_key, host=host, **kwargs)
+        self._http = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                retries=2,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=2.0),
+        )
+
+    def _make_request(self, endpoint, payload):
+        try:
+            response = self._http.post(self.base_url + endpoint, json=payload, headers=self.headers)
+        except httpx.HTTPError as e:
+            return _transport_error(e)
+        return self._handle_response(response)
+
+    def close(self):
+        self._http.close()
+
+class _PayloadBuilder(api):
+    """SDK instance whose methods return (endpoint, payload) instead of sending the request."""
+
+    def _make_request(self, endpoint, payload):
+        return endpoint, payload
+
+class AsyncOpenAlgoClient:
+    """
+    Awaitable counterpart of OpenAlgoClient, used by every tool that returns OpenAlgo's JSON as-is.
+
+    The SDK still builds every payload, but the POST is awaited on a shared
+    httpx.AsyncClient pool so no worker thread sits blocked on OpenAlgo. Only endpoints
+    whose JSON the SDK returns unchanged belong here; history() and instruments()
+    reshape their results into DataFrames and stay on OpenAlgoClient.
+    """
+
+    def __init__(self, api_key, host, **kwargs):
+        self._builder = _PayloadBuilder(api_key=api_key, host=host, **kwargs)
+        self._http = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+                retries=2,
+            ),
+            timeout=httpx.Timeout(self._builder.timeout, connect=2.0),
+        )
+
+    async def request(self, method, **kwargs):
+        built = getattr(self._builder, method)(**kwargs)
+        # Some SDK methods (margin) validate their input and return an error dict
+        # without building a request; pass that through as the result
+        if isinstance(built, dict):
+            return built
+        endpoint, payload = built
+        try:
+            response = await self._http.post(self._builder.base_url + endpoint, json=payload, headers=self._builder.headers)
+        except httpx.HTTPError as e:
+            return _transport_error(e)
+        return self._builder._handle_response(response)
+
+    async def aclose(self):
+        await self._http.aclose()
+
+class QuoteBatcher:
+    """
+    Coalesce concurrent quote lookups into one multiquotes request.
+
+    Lookups arriving within `window` seconds of each other share a round-trip (up to
+    `max_batch` symbols); duplicates share a single result. A window holding one symbol
+    is sent as a plain quotes call, and any symbol the batch response lacks is fetched
+    on its own, so callers always get the same shape as client.quotes().
+    """
+
+    def __init__(self, client, window=0.005, max_batch=50):
+        self._client = client
+        self._window = window
+        self._max_batch = max_batch
+        self._multi = True
+        self._queue = None
+        self._task = None
+        self._dispatching = set()
+
+    async def quote(self, symbol, exchange):
+        # Started on first use so it runs on whichever loop serves the tools (SSE or stdio)
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((symbol, exchange), fut))
+        return await fut
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            # Skip the wait when a full batch is already queued
+            if self._queue.qsize() < self._max_batch - 1:
+                await asyncio.sleep(self._window)
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, batch):
+        waiters = {}
+        for key, fut in batch:
+            waiters.setdefault(key, []).append(fut)
+        try:
+            results = {}
+            if len(waiters) > 1 and self._multi:
+                symbols = [{"symbol": symbol, "exchange": exchange} for symbol, exchange in waiters]
+                results = self._split(await self._client.request("multiquotes", symbols=symbols))
+            missing = [key for key in waiters if key not in results]
+            if missing:
+                fetched = await asyncio.gather(
+                    *(self._client.request("quotes", symbol=symbol, exchange=exchange) for symbol, exchange in missing),
+                    return_exceptions=True,
+                )
+                results.update(zip(missing, fetched))
+        except Exception as e:
+            results = dict.fromkeys(waiters, e)
+        for key, futs in waiters.items():
+            result = results[key]
+            for fut in futs:
+                if fut.done():  # caller went away
+                    continue
+                if isinstance(result, BaseException):
+                    fut.set_exception(result)
+                else:
+                    fut.set_result(result)
+
+    def _split(self, response):
+        """Map a multiquotes response to per-symbol quotes responses."""
+        if response.get("status") != "success":
+            # An OpenAlgo build without the endpoint answers 404; stop trying it
+            if response.get("code") == 404:
+                self._multi = False
+            return {}
+        results = {}
+        for item in response.get("results") or response.get("data") or []:
+            if isinstance(item, dict) and "symbol" in item and "exchange" in item and "data" in item:
+                results[(item["symbol"], item["exchange"])] = {"status": "success", "data": item["data"]}
+        return results
 
 # Initialize OpenAlgo API client
-logging.info(f"Initializing OpenAlgo client with host: {API_HOST} and API key: {API_KEY[:5]}...{API_KEY[-5:]}")
+# Only ever log a masked form of the key
+_MASKED_KEY = f"{API_KEY[:5]}...{API_KEY[-5:]}"
+
+logger.info("Initializing OpenAlgo client with host: %s and API key: %s", API_HOST, _MASKED_KEY)
 try:
-    client = api(api_key=API_KEY, host=API_HOST)
-    logging.info(f"Successfully initialized OpenAlgo client")
+    client = OpenAlgoClient(api_key=API_KEY, host=API_HOST)
+    async_client = AsyncOpenAlgoClient(api_key=API_KEY, host=API_HOST)
+    quote_batcher = QuoteBatcher(async_client)
+    logger.info("Successfully initialized OpenAlgo client")
 except Exception as e:
-    logging.error(f"Error initializing OpenAlgo client: {str(e)}")
-    logger = logging.getLogger(logger_name)
-    logger.propagate = True
+    logger.error("Error initializing OpenAlgo client: %s", e)
     raise
 
+# Market calendar data changes at most once a day
+_holidays_cache = TTLCache(maxsize=16, ttl=86400)
+_timings_cache = TTLCache(maxsize=512, ttl=86400)
+# Broker reference data: supported intervals are fixed per broker, symbol metadata
+# (lot size, tick size, expiry) only changes with the daily master contract refresh
+_intervals_cache = TTLCache(maxsize=1, ttl=86400)
+_symbol_cache = TTLCache(maxsize=4096, ttl=3600)
+# get_orders and get_order_book read the same endpoint; a short TTL lets back-to-back
+# calls share one response. Entries are keyed by _orderbook_version, which every
+# order-changing request bumps, so a book fetched before a change is never reused after it.
+_orderbook_cache = TTLCache(maxsize=1, ttl=0.5)
+_orderbook_version = 0
+_inflight = {}
+
+def _single_flight(key, fetch):
+    """
+    Await fetch() at most once per key at a time.
+
+    Callers arriving while a call for the same key is in flight share its result
+    instead of issuing their own upstream request.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = _inflight[key] = asyncio.ensure_future(fetch())
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return asyncio.shield(task)
+
+async def _cached(cache, key, fetch):
+    """
+    Return cache[key], awaiting fetch() to fill it on a miss.
+
+    Concurrent misses for the same key share a single upstream call, and only
+    successful responses are stored so errors are retried on the next call.
+    """
+    if key in cache:
+        return cache[key]
+    response = await _single_flight((id(cache), key), fetch)
+    if isinstance(response, dict) and response.get('status') == 'success':
+        cache[key] = response
+    return response
+
+def _orderbook_once():
+    """Fetch the order book, shared by concurrent and back-to-back callers."""
+    return _cached(_orderbook_cache, _orderbook_version, lambda: async_client.request("orderbook"))
+
+async def _order_request(method, **kwargs):
+    """Send a request that can change the order book and invalidate the shared copy."""
+    global _orderbook_version
+    try:
+        return await async_client.request(method, **kwargs)
+    finally:
+        # Also on errors and timeouts, since the request may still have reached the broker
+        _orderbook_version += 1
+        _orderbook_cache.clear()
+
+# Broker payloads can carry numeric dict keys and numpy scalars
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _ser(response):
+    """Serialize an OpenAlgo response as JSON text for the MCP client."""
+    # The SDK hands back plain dicts for everything except DataFrame endpoints
+    if type(response) is dict:
+        return orjson.dumps(response, default=str, option=_JSON_OPTIONS).decode()
+    if isinstance(response, str):
+        return response
+    if hasattr(response, "to_json"):
+        # history() and instruments() come back as DataFrames; history is indexed by
+        # timestamp, which is kept as a field
+        frame = response if response.index.name is None else response.reset_index()
+        return frame.to_json(orient="records", date_format="iso")
+    return orjson.dumps(response, default=str, option=_JSON_OPTIONS).decode()
+
+def _use_tool_executor():
+    """Size the running loop's default executor, which runs every blocking SDK call, for concurrent tool calls."""
+    # The stock pool is min(32, cpus + 4) threads; calls mostly wait on OpenAlgo, so allow more.
+    # Named threads make the pool easy to pick out in py-spy and thread dumps.
+    executor = ThreadPoolExecutor(max_workers=THREAD_POOL, thread_name_prefix="openalgo")
+    asyncio.get_running_loop().set_default_executor(executor)
+
+def _cap_rows(result):
+    """Trim row data past MAX_ROWS, recording the original size so the caller can narrow the query."""
+    if hasattr(result, "iloc"):
+        total = len(result)
+        if total <= MAX_ROWS:
+            return result
+        return {"status": "success", "data": orjson.Fragment(_ser(result.iloc[:MAX_ROWS])), "truncated": True, "total_rows": total}
+    if isinstance(result, dict) and isinstance(result.get("data"), list) and len(result["data"]) > MAX_ROWS:
+        return {**result, "data": result["data"][:MAX_ROWS], "truncated": True, "total_rows": len(result["data"])}
+    return result
+
+def _fail(action, exc):
+    """Log a failed tool call once and return the error as JSON for the MCP client."""
+    msg = f"Error {action}: {exc}"
+    # Tracebacks are only formatted in debug mode so an upstream outage stays cheap to report
+    logger.error(msg, exc_info=exc if DEBUG else None)
+    return orjson.dumps({"error": msg}).decode()
+
+def tool_safe(action):
+    """
+    Turn any exception raised by the decorated tool into an `_fail(action, ...)` result.
+
+    The tool body runs as-is on the happy path; logging and error formatting live
+    here so tracing or latency metrics can be added in one place.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                return _fail(action, e)
+        return wrapper
+    return decorator
+
 # Create an MCP server called "openalgo"
 mcp = FastMCP("OpenAlgo MCP", instructions="""
 OpenAlgo MCP Server provides AI assistants with access to trading capabilities through OpenAlgo API.
@@ -72,8 +441,82 @@ This server exposes various trading functions like:
 - Accessing historical data
 """)
 
+def _client_tool(method, action, changes_orders=False):
+    """
+    Register a tool that forwards its arguments unchanged to the SDK method `method`.
+
+    The decorated function only declares the tool's name, signature and docstring;
+    the request method and the error action are bound once here instead of on every call.
+    """
+    call = functools.partial(_order_request if changes_orders else async_client.request, method)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def tool(**kwargs):
+            return _ser(await call(**kwargs))
+        return mcp.tool()(tool_safe(action)(tool))
+    return decorator
+
+# Request schemas, compiled once so malformed legs/orders fail locally instead of
+# costing a round-trip to OpenAlgo. Unknown keys are kept and forwarded as-is.
+
+class BasketOrder(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    symbol: str
+    exchange: str
+    action: str
+    quantity: int
+    pricetype: str = "MARKET"
+    product: str = "MIS"
+    price: Optional[float] = None
+    trigger_price: Optional[float] = None
+    disclosed_quantity: Optional[int] = None
+
+class OptionLeg(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    offset: str
+    option_type: str
+    action: str
+    quantity: int
+    expiry_date: Optional[str] = None
+    pricetype: Optional[str] = None
+    product: Optional[str] = None
+    price: Optional[float] = None
+    trigger_price: Optional[float] = None
+
+class Position(BaseModel):
+    # The margin API takes quantity/price as strings; numbers are coerced so both forms work
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    symbol: str
+    exchange: str
+    action: str
+    product: str
+    pricetype: str
+    quantity: str
+    price: Optional[str] = None
+    trigger_price: Optional[str] = None
+
+# Order enums are upper-cased and checked while FastMCP validates the arguments,
+# so "buy"/"nse" still work and a typo is rejected before any request is sent
+def _upper(value):
+    return value.upper() if isinstance(value, str) else value
+
+Upper = Annotated[str, BeforeValidator(_upper)]
+Action = Annotated[Literal["BUY", "SELL"], BeforeValidator(_upper)]
+Exchange = Annotated[Literal["NSE", "BSE", "NFO", "BFO", "CDS", "BCD", "MCX", "NCDEX"], BeforeValidator(_upper)]
+PriceType = Annotated[Literal["MARKET", "LIMIT", "SL", "SL-M"], BeforeValidator(_upper)]
+Product = Annotated[Literal["MIS", "CNC", "NRML"], BeforeValidator(_upper)]
+
+_BASKET_ORDERS = TypeAdapter(list[BasketOrder])
+_OPTION_LEGS = TypeAdapter(list[OptionLeg])
+_POSITIONS = TypeAdapter(list[Position])
+
 @mcp.tool()
-def place_order(symbol: str, quantity: int, action: str, exchange: str = "NSE", price_type: str = "MARKET", product: str = "MIS", strategy: str = "Python", price: float = None, trigger_price: float = None, disclosed_quantity: int = None) -> str:
+@tool_safe("placing order")
+async def place_order(symbol: Upper, quantity: int, action: Action, exchange: Exchange = "NSE", price_type: PriceType = "MARKET", product: Product = "MIS", strategy: str = "Python", price: float = None, trigger_price: float = None, disclosed_quantity: int = None) -> str:
     """
     Place a new order in OpenAlgo.
 
@@ -89,32 +532,29 @@ def place_order(symbol: str, quantity: int, action: str, exchange: str = "NSE",
         trigger_price: Trigger price (required for SL, SL-M orders)
         disclosed_quantity: Disclosed quantity
     """
-    try:
-        logging.info(f"Placing order: {action} {quantity} {symbol} on {exchange} as {price_type} for {product}")
-        params = {
-            "strategy": strategy,
-            "symbol": symbol.upper(),
-            "action": action.upper(),
-            "exchange": exchange.upper(),
-            "price_type": price_type.upper(),
-            "product": product.upper(),
-            "quantity": quantity
-        }
-        if price is not None:
-            params["price"] = price
-        if trigger_price is not None:
-            params["trigger_price"] = trigger_price
-        if disclosed_quantity is not None:
-            params["disclosed_quantity"] = disclosed_quantity
-
-        response = client.placeorder(**params)
-        return f"Order placed: {response}"
-    except Exception as e:
-        logging.error(f"Error placing order: {str(e)}")
-        return f"Error placing order: {str(e)}"
+    logger.info("Placing order: %s %s %s on %s as %s for %s", action, quantity, symbol, exchange, price_type, product)
+    params = {
+        "strategy": strategy,
+        "symbol": symbol,
+        "action": action,
+        "exchange": exchange,
+        "price_type": price_type,
+        "product": product,
+        "quantity": quantity
+    }
+    if price is not None:
+        params["price"] = price
+    if trigger_price is not None:
+        params["trigger_price"] = trigger_price
+    if disclosed_quantity is not None:
+        params["disclosed_quantity"] = disclosed_quantity
+
+    response = await _order_request("placeorder", **params)
+    return _ser(response)
 
 @mcp.tool()
-def get_quote(symbol: str, exchange: str = "NSE") -> str:
+@tool_safe("getting quotes")
+async def get_quote(symbol: str, exchange: str = "NSE") -> str:
     """
     Get market quotes for a symbol.
     
@@ -122,119 +562,84 @@ def get_quote(symbol: str, exchange: str = "NSE") -> str:
         symbol: Trading symbol (e.g., SBIN, RELIANCE)
         exchange: Exchange (NSE, BSE, etc.)
     """
-    try:
-        # Log the request parameters
-        logging.info(f"QUOTES REQUEST - Symbol: {symbol.upper()}, Exchange: {exchange.upper()}, API Key: {API_KEY[:5]}...{API_KEY[-5:]}")
-        
-        # Make the API call with debug=True to log the raw HTTP request
-        quote = client.quotes(symbol=symbol.upper(), exchange=exchange.upper())
-        
-        # Log the success response
-        logging.info(f"QUOTES RESPONSE - Success: {quote}")
-        return str(quote)
-    except Exception as e:
-        # Log the detailed error
-        logging.error(f"QUOTES ERROR - {str(e)}")
-        import traceback
-        logging.error(f"QUOTES TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting quotes: {str(e)}"
-
-@mcp.tool()
-def get_depth(symbol: str, exchange: str = "NSE") -> str:
-    try:
-        return str(client.depth(symbol=symbol.upper(), exchange=exchange.upper()))
-    except Exception as e:
-        return f"Error: {str(e)}"
+    sym, exch = symbol.upper(), exchange.upper()
+    # Request/response echoes are debug-only; quotes are polled far too often for INFO
+    logger.debug("QUOTES REQUEST - Symbol: %s, Exchange: %s, API Key: %s", sym, exch, _MASKED_KEY)
+    
+    # Concurrent lookups share one multiquotes round-trip
+    quote = await quote_batcher.quote(sym, exch)
+    
+    logger.debug("QUOTES RESPONSE - Success: %s", quote)
+    return _ser(quote)
 
 @mcp.tool()
-def get_history(symbol: str, exchange: str, interval: str, start_date: str, end_date: str) -> str:
-    try:
-        return str(client.history(symbol=symbol.upper(), exchange=exchange.upper(), interval=interval, start_date=start_date, end_date=end_date))
-    except Exception as e:
-        return f"Error fetching history: {str(e)}"
+@tool_safe("getting depth")
+async def get_depth(symbol: str, exchange: str = "NSE") -> str:
+    return _ser(await async_client.request("depth", symbol=symbol.upper(), exchange=exchange.upper()))
+
+@mcp.tool()
+@tool_safe("fetching history")
+async def get_history(symbol: str, exchange: str, interval: str, start_date: str, end_date: str) -> str:
+    result = await asyncio.to_thread(client.history, symbol=symbol.upper(), exchange=exchange.upper(), interval=interval, start_date=start_date, end_date=end_date)
+    return _ser(_cap_rows(result))
 
 @mcp.tool()
-def get_intervals() -> str:
+@tool_safe("getting intervals")
+async def get_intervals() -> str:
     """Get available intervals for historical data."""
-    try:
-        logging.info("Getting available intervals")
-        result = client.intervals()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting intervals: {str(e)}")
-        import traceback
-        logging.error(f"INTERVALS TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting intervals: {str(e)}"
+    logger.info("Getting available intervals")
+    result = await _cached(_intervals_cache, None, lambda: async_client.request("intervals"))
+    return _ser(result)
 
 @mcp.tool()
-def get_symbol_metadata(symbol: str, exchange: str) -> str:
+@tool_safe("getting symbol metadata")
+async def get_symbol_metadata(symbol: str, exchange: str) -> str:
     """Get metadata for a specific symbol."""
-    try:
-        logging.info(f"Getting metadata for {symbol.upper()} on {exchange.upper()}")
-        result = client.symbol(symbol=symbol.upper(), exchange=exchange.upper())
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting symbol metadata: {str(e)}")
-        import traceback
-        logging.error(f"SYMBOL METADATA TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting symbol metadata: {str(e)}"
+    sym, exch = symbol.upper(), exchange.upper()
+    logger.info("Getting metadata for %s on %s", sym, exch)
+    result = await _cached(_symbol_cache, (sym, exch), lambda: async_client.request("symbol", symbol=sym, exchange=exch))
+    return _ser(result)
 
 @mcp.tool()
-def get_all_tickers(exchange: str = None) -> str:
+@tool_safe("fetching tickers")
+async def get_all_tickers(exchange: str = None) -> str:
     """
     Get all available tickers/symbols.
     
     Args:
         exchange: Optional exchange filter (NSE, BSE, etc.)
     """
-    try:
-        params = {}
-        if exchange:
-            params["exchange"] = exchange.upper()
-            
-        result = client.ticker(**params)
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error fetching tickers: {str(e)}")
-        return f"Error fetching tickers: {str(e)}"
+    # The SDK has no ticker listing; the instruments download is the symbol master,
+    # across every exchange when none is given
+    params = {}
+    if exchange:
+        params["exchange"] = exchange.upper()
+
+    result = await asyncio.to_thread(client.instruments, **params)
+    return _ser(_cap_rows(result))
 
 @mcp.tool()
-def get_funds() -> str:
+@tool_safe("getting funds")
+async def get_funds() -> str:
     """
     Get available funds and margin information.
     """
-    try:
-        # Log the request
-        logging.info(f"FUNDS REQUEST - API Key: {API_KEY[:5]}...{API_KEY[-5:]}")
-        
-        # Make the API call
-        result = client.funds()
-        
-        # Log the success response
-        logging.info(f"FUNDS RESPONSE - Success: {result}")
-        return str(result)
-    except Exception as e:
-        # Log the detailed error
-        logging.error(f"FUNDS ERROR - {str(e)}")
-        import traceback
-        logging.error(f"FUNDS TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting funds: {str(e)}"
-
-@mcp.tool()
-def get_orders() -> str:
+    logger.debug("FUNDS REQUEST - API Key: %s", _MASKED_KEY)
+    result = await async_client.request("funds")
+    logger.debug("FUNDS RESPONSE - Success: %s", result)
+    return _ser(result)
+
+@mcp.tool()
+@tool_safe("getting orders")
+async def get_orders() -> str:
     """Get all orders for the current strategy."""
-    try:
-        logging.info("Getting orders for strategy Python")
-        result = client.orderbook()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting orders: {str(e)}")
-        import traceback
-        logging.error(f"ORDERS TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting orders: {str(e)}"
+    logger.info("Getting orders for strategy Python")
+    result = await _orderbook_once()
+    return _ser(result)
 
 @mcp.tool()
-def modify_order(order_id: str, symbol: str, action: str, exchange: str, product: str, quantity: int, price: float, price_type: str = "LIMIT", strategy: str = "Python", disclosed_quantity: int = 0, trigger_price: float = 0) -> str:
+@tool_safe("modifying order")
+async def modify_order(order_id: str, symbol: Upper, action: Action, exchange: Exchange, product: Product, quantity: int, price: float, price_type: PriceType = "LIMIT", strategy: str = "Python", disclosed_quantity: int = 0, trigger_price: float = 0) -> str:
     """
     Modify an existing order.
 
@@ -251,141 +656,96 @@ def modify_order(order_id: str, symbol: str, action: str, exchange: str, product
         disclosed_quantity: Disclosed quantity (default: 0)
         trigger_price: Trigger price for SL orders (default: 0)
     """
-    try:
-        logging.info(f"Modifying order {order_id}: {symbol} {action} qty={quantity} price={price}")
-        result = client.modifyorder(
-            order_id=order_id,
-            strategy=strategy,
-            symbol=symbol.upper(),
-            action=action.upper(),
-            exchange=exchange.upper(),
-            price_type=price_type.upper(),
-            product=product.upper(),
-            quantity=quantity,
-            price=price,
-            disclosed_quantity=disclosed_quantity,
-            trigger_price=trigger_price
-        )
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error modifying order: {str(e)}")
-        return f"Error modifying order: {str(e)}"
+    logger.info("Modifying order %s: %s %s qty=%s price=%s", order_id, symbol, action, quantity, price)
+    result = await _order_request(
+        "modifyorder",
+        order_id=order_id,
+        strategy=strategy,
+        symbol=symbol,
+        action=action,
+        exchange=exchange,
+        price_type=price_type,
+        product=product,
+        quantity=quantity,
+        price=price,
+        disclosed_quantity=disclosed_quantity,
+        trigger_price=trigger_price
+    )
+    return _ser(result)
 
 @mcp.tool()
-def cancel_order(order_id: str) -> str:
+@tool_safe("cancelling order")
+async def cancel_order(order_id: str) -> str:
     """Cancel a specific order by ID."""
-    try:
-        logging.info(f"Cancelling order {order_id}")
-        result = client.cancelorder(order_id=order_id, strategy="Python")
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error cancelling order: {str(e)}")
-        import traceback
-        logging.error(f"CANCEL ORDER TRACEBACK: {traceback.format_exc()}")
-        return f"Error cancelling order: {str(e)}"
+    logger.info("Cancelling order %s", order_id)
+    result = await _order_request("cancelorder", order_id=order_id, strategy="Python")
+    return _ser(result)
 
 @mcp.tool()
-def cancel_all_orders() -> str:
+@tool_safe("cancelling all orders")
+async def cancel_all_orders() -> str:
     """Cancel all open orders for the current strategy."""
-    try:
-        logging.info("Cancelling all orders for strategy Python")
-        result = client.cancelallorder(strategy="Python")
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error cancelling all orders: {str(e)}")
-        import traceback
-        logging.error(f"CANCEL ALL ORDERS TRACEBACK: {traceback.format_exc()}")
-        return f"Error cancelling all orders: {str(e)}"
+    logger.info("Cancelling all orders for strategy Python")
+    result = await _order_request("cancelallorder", strategy="Python")
+    return _ser(result)
 
 @mcp.tool()
-def get_order_status(order_id: str) -> str:
+@tool_safe("getting order status")
+async def get_order_status(order_id: str) -> str:
     """Get status of a specific order by ID."""
-    try:
-        logging.info(f"Getting status for order {order_id}")
-        result = client.orderstatus(order_id=order_id, strategy="Python")
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting order status: {str(e)}")
-        import traceback
-        logging.error(f"ORDER STATUS TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting order status: {str(e)}"
+    logger.info("Getting status for order %s", order_id)
+    result = await async_client.request("orderstatus", order_id=order_id, strategy="Python")
+    return _ser(result)
 
 @mcp.tool()
-def get_open_position(symbol: str, exchange: str, product: str) -> str:
+@tool_safe("getting open position")
+async def get_open_position(symbol: str, exchange: str, product: str) -> str:
     """Get details of an open position for a specific symbol."""
-    try:
-        logging.info(f"Getting open position for {symbol} on {exchange} with product {product}")
-        result = client.openposition(strategy="Python", symbol=symbol, exchange=exchange, product=product)
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting open position: {str(e)}")
-        import traceback
-        logging.error(f"OPEN POSITION TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting open position: {str(e)}"
+    logger.info("Getting open position for %s on %s with product %s", symbol, exchange, product)
+    result = await async_client.request("openposition", strategy="Python", symbol=symbol, exchange=exchange, product=product)
+    return _ser(result)
 
 @mcp.tool()
-def close_all_positions() -> str:
+@tool_safe("closing all positions")
+async def close_all_positions() -> str:
     """Close all open positions for the current strategy."""
-    try:
-        logging.info("Closing all positions for strategy Python")
-        result = client.closeposition(strategy="Python")
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error closing all positions: {str(e)}")
-        import traceback
-        logging.error(f"CLOSE POSITIONS TRACEBACK: {traceback.format_exc()}")
-        return f"Error closing all positions: {str(e)}"
+    logger.info("Closing all positions for strategy Python")
+    result = await _order_request("closeposition", strategy="Python")
+    return _ser(result)
 
 @mcp.tool()
-def get_position_book() -> str:
+@tool_safe("getting position book")
+async def get_position_book() -> str:
     """Get details of all current positions."""
-    try:
-        logging.info("Getting position book")
-        result = client.positionbook()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting position book: {str(e)}")
-        import traceback
-        logging.error(f"POSITION BOOK TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting position book: {str(e)}"
+    logger.info("Getting position book")
+    result = await async_client.request("positionbook")
+    return _ser(result)
 
 @mcp.tool()
-def get_order_book() -> str:
+@tool_safe("getting order book")
+async def get_order_book() -> str:
     """Get details of all orders."""
-    try:
-        logging.info("Getting order book")
-        result = client.orderbook()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting order book: {str(e)}")
-        import traceback
-        logging.error(f"ORDER BOOK TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting order book: {str(e)}"
+    logger.info("Getting order book")
+    result = await _orderbook_once()
+    return _ser(result)
 
 @mcp.tool()
-def get_trade_book() -> str:
+@tool_safe("getting trade book")
+async def get_trade_book() -> str:
     """Get details of all executed trades."""
-    try:
-        logging.info("Getting trade book")
-        result = client.tradebook()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error getting trade book: {str(e)}")
-        import traceback
-        logging.error(f"TRADE BOOK TRACEBACK: {traceback.format_exc()}")
-        return f"Error getting trade book: {str(e)}"
+    logger.info("Getting trade book")
+    result = await async_client.request("tradebook")
+    return _ser(result)
 
 @mcp.tool()
-def get_holdings() -> str:
-    try:
-        result = client.holdings()
-        return str(result)
-    except Exception as e:
-        logging.error(f"Error fetching holdings: {str(e)}")
-        return f"Error fetching holdings: {str(e)}"
+@tool_safe("fetching holdings")
+async def get_holdings() -> str:
+    result = await async_client.request("holdings")
+    return _ser(result)
 
 @mcp.tool()
-def place_basket_order(orders: list, strategy: str = "Python") -> str:
+@tool_safe("placing basket order")
+async def place_basket_order(orders: list[BasketOrder], strategy: str = "Python") -> str:
     """
     Place multiple orders at once using basket order functionality.
 
@@ -419,16 +779,32 @@ def place_basket_order(orders: list, strategy: str = "Python") -> str:
         }
     ]
     """
-    try:
-        logging.info(f"Placing basket order with {len(orders)} orders")
-        response = client.basketorder(strategy=strategy, orders=orders)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error placing basket order: {str(e)}")
-        return f"Error placing basket order: {str(e)}"
+    logger.info("Placing basket order with %s orders", len(orders))
+    payload = _BASKET_ORDERS.dump_python(orders, exclude_none=True)
+    if not BASKET_CHUNK or len(payload) <= BASKET_CHUNK:
+        response = await _order_request("basketorder", strategy=strategy, orders=payload)
+        return _ser(response)
+
+    # OpenAlgo places a basket's BUY legs before its SELL legs so hedges get margin
+    # benefit, but only within one request. Batches therefore go out one at a time with
+    # every BUY in the earliest ones, and sending stops at the first batch that fails.
+    payload.sort(key=lambda order: str(order["action"]).upper() != "BUY")
+    batches = []
+    for start in range(0, len(payload), BASKET_CHUNK):
+        try:
+            response = await _order_request("basketorder", strategy=strategy, orders=payload[start:start + BASKET_CHUNK])
+        except Exception as e:
+            response = {"status": "error", "message": str(e)}
+        batches.append(response)
+        if not isinstance(response, dict) or response.get("status") != "success":
+            sent = start + BASKET_CHUNK
+            logger.error("Basket batch %s failed; %s orders not sent", len(batches), max(0, len(payload) - sent))
+            return _ser({"status": "error", "batches": batches, "not_sent": payload[sent:]})
+    return _ser({"status": "success", "batches": batches})
 
 @mcp.tool()
-def place_split_order(symbol: str, exchange: str, action: str, quantity: int, splitsize: int, price_type: str = "MARKET", product: str = "MIS", price: float = 0, trigger_price: float = 0, strategy: str = "Python") -> str:
+@tool_safe("placing split order")
+async def place_split_order(symbol: str, exchange: str, action: str, quantity: int, splitsize: int, price_type: str = "MARKET", product: str = "MIS", price: float = 0, trigger_price: float = 0, strategy: str = "Python") -> str:
     """
     Split a large order into multiple smaller orders to reduce market impact.
     
@@ -444,34 +820,32 @@ def place_split_order(symbol: str, exchange: str, action: str, quantity: int, sp
         trigger_price: Trigger price (for SL orders)
         strategy: Strategy name (default: Python)
     """
-    try:
-        logging.info(f"Placing split order: {action} {quantity} {symbol} (split size: {splitsize})")
-        params = {
-            "symbol": symbol.upper(),
-            "exchange": exchange.upper(),
-            "action": action.upper(),
-            "quantity": quantity,
-            "splitsize": splitsize,
-            "price_type": price_type.upper(),
-            "product": product.upper()
-        }
+    sym, act, pt = symbol.upper(), action.upper(), price_type.upper()
+    logger.info("Placing split order: %s %s %s (split size: %s)", act, quantity, sym, splitsize)
+    params = {
+        "symbol": sym,
+        "exchange": exchange.upper(),
+        "action": act,
+        "quantity": quantity,
+        "splitsize": splitsize,
+        "price_type": pt,
+        "product": product.upper()
+    }
+    
+    # Add optional parameters if relevant
+    if price and pt in ("LIMIT", "SL"):
+        params["price"] = price
+    if trigger_price and pt in ("SL", "SL-M"):
+        params["trigger_price"] = trigger_price
+    if strategy:
+        params["strategy"] = strategy
         
-        # Add optional parameters if relevant
-        if price and price_type.upper() in ["LIMIT", "SL"]:
-            params["price"] = price
-        if trigger_price and price_type.upper() in ["SL", "SL-M"]:
-            params["trigger_price"] = trigger_price
-        if strategy:
-            params["strategy"] = strategy
-            
-        response = client.splitorder(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error placing split order: {str(e)}")
-        return f"Error placing split order: {str(e)}"
-
-@mcp.tool()
-def place_smart_order(symbol: str, action: str, quantity: int, position_size: int, exchange: str = "NSE", price_type: str = "MARKET", product: str = "MIS", strategy: str = "Python", price: float = None, trigger_price: float = None, disclosed_quantity: int = None) -> str:
+    response = await _order_request("splitorder", **params)
+    return _ser(response)
+
+@mcp.tool()
+@tool_safe("placing smart order")
+async def place_smart_order(symbol: str, action: str, quantity: int, position_size: int, exchange: str = "NSE", price_type: str = "MARKET", product: str = "MIS", strategy: str = "Python", price: float = None, trigger_price: float = None, disclosed_quantity: int = None) -> str:
     """
     Place a smart order that considers the current position size.
 
@@ -488,35 +862,33 @@ def place_smart_order(symbol: str, action: str, quantity: int, position_size: in
         trigger_price: Trigger price (required for SL orders)
         disclosed_quantity: Disclosed quantity
     """
-    try:
-        logging.info(f"Placing smart order: {action} {quantity} {symbol} with position size {position_size}")
-        params = {
-            "strategy": strategy,
-            "symbol": symbol.upper(),
-            "action": action.upper(),
-            "exchange": exchange.upper(),
-            "price_type": price_type.upper(),
-            "product": product.upper(),
-            "quantity": quantity,
-            "position_size": position_size
-        }
-        if price is not None:
-            params["price"] = price
-        if trigger_price is not None:
-            params["trigger_price"] = trigger_price
-        if disclosed_quantity is not None:
-            params["disclosed_quantity"] = disclosed_quantity
-
-        response = client.placesmartorder(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error placing smart order: {str(e)}")
-        return f"Error placing smart order: {str(e)}"
+    sym, act = symbol.upper(), action.upper()
+    logger.info("Placing smart order: %s %s %s with position size %s", act, quantity, sym, position_size)
+    params = {
+        "strategy": strategy,
+        "symbol": sym,
+        "action": act,
+        "exchange": exchange.upper(),
+        "price_type": price_type.upper(),
+        "product": product.upper(),
+        "quantity": quantity,
+        "position_size": position_size
+    }
+    if price is not None:
+        params["price"] = price
+    if trigger_price is not None:
+        params["trigger_price"] = trigger_price
+    if disclosed_quantity is not None:
+        params["disclosed_quantity"] = disclosed_quantity
+
+    response = await _order_request("placesmartorder", **params)
+    return _ser(response)
 
 # OPTIONS TRADING TOOLS
 
 @mcp.tool()
-def place_options_order(underlying: str, exchange: str, offset: str, option_type: str, action: str, quantity: int, expiry_date: str = None, strategy: str = "Python", price_type: str = "MARKET", product: str = "MIS", price: float = None, trigger_price: float = None) -> str:
+@tool_safe("placing options order")
+async def place_options_order(underlying: str, exchange: str, offset: str, option_type: str, action: str, quantity: int, expiry_date: str = None, strategy: str = "Python", price_type: str = "MARKET", product: str = "MIS", price: float = None, trigger_price: float = None) -> str:
     """
     Place an options order with ATM/ITM/OTM offset.
 
@@ -534,34 +906,31 @@ def place_options_order(underlying: str, exchange: str, offset: str, option_type
         price: Limit price (required for LIMIT orders)
         trigger_price: Trigger price (required for SL and SL-M orders)
     """
-    try:
-        params = {
-            "strategy": strategy,
-            "underlying": underlying.upper(),
-            "exchange": exchange.upper(),
-            "offset": offset.upper(),
-            "option_type": option_type.upper(),
-            "action": action.upper(),
-            "quantity": quantity,
-            "price_type": price_type.upper(),
-            "product": product.upper()
-        }
-        if expiry_date:
-            params["expiry_date"] = expiry_date
-        if price is not None:
-            params["price"] = price
-        if trigger_price is not None:
-            params["trigger_price"] = trigger_price
-
-        logging.info(f"Placing options order: {action} {quantity} {underlying} {offset} {option_type}")
-        response = client.optionsorder(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error placing options order: {str(e)}")
-        return f"Error placing options order: {str(e)}"
+    params = {
+        "strategy": strategy,
+        "underlying": underlying.upper(),
+        "exchange": exchange.upper(),
+        "offset": offset.upper(),
+        "option_type": option_type.upper(),
+        "action": action.upper(),
+        "quantity": quantity,
+        "price_type": price_type.upper(),
+        "product": product.upper()
+    }
+    if expiry_date:
+        params["expiry_date"] = expiry_date
+    if price is not None:
+        params["price"] = price
+    if trigger_price is not None:
+        params["trigger_price"] = trigger_price
+
+    logger.info("Placing options order: %s %s %s %s %s", params["action"], quantity, params["underlying"], params["offset"], params["option_type"])
+    response = await _order_request("optionsorder", **params)
+    return _ser(response)
 
 @mcp.tool()
-def place_options_multi_order(strategy: str, underlying: str, exchange: str, legs: list, expiry_date: str = None) -> str:
+@tool_safe("placing options multi order")
+async def place_options_multi_order(strategy: str, underlying: str, exchange: str, legs: Annotated[list[OptionLeg], Field(min_length=1, max_length=20)], expiry_date: str = None) -> str:
     """
     Place a multi-leg options order (spreads, iron condor, straddles, etc.).
 
@@ -585,25 +954,22 @@ def place_options_multi_order(strategy: str, underlying: str, exchange: str, leg
             {"offset": "OTM5", "option_type": "PE", "action": "SELL", "quantity": 75}
         ]
     """
-    try:
-        params = {
-            "strategy": strategy,
-            "underlying": underlying.upper(),
-            "exchange": exchange.upper(),
-            "legs": legs
-        }
-        if expiry_date:
-            params["expiry_date"] = expiry_date
-
-        logging.info(f"Placing options multi order: {len(legs)} legs on {underlying}")
-        response = client.optionsmultiorder(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error placing options multi order: {str(e)}")
-        return f"Error placing options multi order: {str(e)}"
+    params = {
+        "strategy": strategy,
+        "underlying": underlying.upper(),
+        "exchange": exchange.upper(),
+        "legs": _OPTION_LEGS.dump_python(legs, exclude_none=True)
+    }
+    if expiry_date:
+        params["expiry_date"] = expiry_date
+
+    logger.info("Placing options multi order: %s legs on %s", len(legs), underlying)
+    response = await _order_request("optionsmultiorder", **params)
+    return _ser(response)
 
 @mcp.tool()
-def get_option_symbol(underlying: str, exchange: str, offset: str, option_type: str, expiry_date: str = None) -> str:
+@tool_safe("getting option symbol")
+async def get_option_symbol(underlying: str, exchange: str, offset: str, option_type: str, expiry_date: str = None) -> str:
     """
     Get option symbol for specific strike and expiry.
 
@@ -614,24 +980,21 @@ def get_option_symbol(underlying: str, exchange: str, offset: str, option_type:
         option_type: 'CE' for Call or 'PE' for Put
         expiry_date: Expiry date in format 'DDMMMYY' (e.g., '28OCT25')
     """
-    try:
-        params = {
-            "underlying": underlying.upper(),
-            "exchange": exchange.upper(),
-            "offset": offset.upper(),
-            "option_type": option_type.upper()
-        }
-        if expiry_date:
-            params["expiry_date"] = expiry_date
-
-        response = client.optionsymbol(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting option symbol: {str(e)}")
-        return f"Error getting option symbol: {str(e)}"
+    params = {
+        "underlying": underlying.upper(),
+        "exchange": exchange.upper(),
+        "offset": offset.upper(),
+        "option_type": option_type.upper()
+    }
+    if expiry_date:
+        params["expiry_date"] = expiry_date
+
+    response = await async_client.request("optionsymbol", **params)
+    return _ser(response)
 
 @mcp.tool()
-def get_option_chain(underlying: str, exchange: str, expiry_date: str = None, strike_count: int = None) -> str:
+@tool_safe("getting option chain")
+async def get_option_chain(underlying: str, exchange: str, expiry_date: str = None, strike_count: int = None) -> str:
     """
     Get option chain data with real-time quotes for all strikes.
 
@@ -641,24 +1004,21 @@ def get_option_chain(underlying: str, exchange: str, expiry_date: str = None, st
         expiry_date: Expiry date in DDMMMYY format (e.g., '30DEC25')
         strike_count: Number of strikes above and below ATM (1-100)
     """
-    try:
-        params = {
-            "underlying": underlying.upper(),
-            "exchange": exchange.upper()
-        }
-        if expiry_date:
-            params["expiry_date"] = expiry_date
-        if strike_count:
-            params["strike_count"] = strike_count
-
-        response = client.optionchain(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting option chain: {str(e)}")
-        return f"Error getting option chain: {str(e)}"
+    params = {
+        "underlying": underlying.upper(),
+        "exchange": exchange.upper()
+    }
+    if expiry_date:
+        params["expiry_date"] = expiry_date
+    if strike_count:
+        params["strike_count"] = strike_count
+
+    response = await async_client.request("optionchain", **params)
+    return _ser(response)
 
 @mcp.tool()
-def get_option_greeks(symbol: str, exchange: str, interest_rate: float = 0.0, underlying_symbol: str = None, underlying_exchange: str = None) -> str:
+@tool_safe("calculating option greeks")
+async def get_option_greeks(symbol: str, exchange: str, interest_rate: float = 0.0, underlying_symbol: str = None, underlying_exchange: str = None) -> str:
     """
     Calculate option Greeks (delta, gamma, theta, vega, rho).
 
@@ -669,25 +1029,22 @@ def get_option_greeks(symbol: str, exchange: str, interest_rate: float = 0.0, un
         underlying_symbol: Underlying symbol (e.g., 'NIFTY')
         underlying_exchange: Underlying exchange ('NSE_INDEX')
     """
-    try:
-        params = {
-            "symbol": symbol.upper(),
-            "exchange": exchange.upper(),
-            "interest_rate": interest_rate
-        }
-        if underlying_symbol:
-            params["underlying_symbol"] = underlying_symbol.upper()
-        if underlying_exchange:
-            params["underlying_exchange"] = underlying_exchange.upper()
-
-        response = client.optiongreeks(**params)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error calculating option greeks: {str(e)}")
-        return f"Error calculating option greeks: {str(e)}"
+    params = {
+        "symbol": symbol.upper(),
+        "exchange": exchange.upper(),
+        "interest_rate": interest_rate
+    }
+    if underlying_symbol:
+        params["underlying_symbol"] = underlying_symbol.upper()
+    if underlying_exchange:
+        params["underlying_exchange"] = underlying_exchange.upper()
+
+    response = await async_client.request("optiongreeks", **params)
+    return _ser(response)
 
 @mcp.tool()
-def get_synthetic_future(underlying: str, exchange: str, expiry_date: str) -> str:
+@tool_safe("calculating synthetic future")
+async def get_synthetic_future(underlying: str, exchange: str, expiry_date: str) -> str:
     """
     Calculate synthetic future price using put-call parity.
 
@@ -696,21 +1053,19 @@ def get_synthetic_future(underlying: str, exchange: str, expiry_date: str) -> st
         exchange: Exchange for underlying ('NSE_INDEX', 'BSE_INDEX')
         expiry_date: Expiry date in format 'DDMMMYY' (e.g., '25NOV25')
     """
-    try:
-        response = client.syntheticfuture(
-            underlying=underlying.upper(),
-            exchange=exchange.upper(),
-            expiry_date=expiry_date
-        )
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error calculating synthetic future: {str(e)}")
-        return f"Error calculating synthetic future: {str(e)}"
+    response = await async_client.request(
+        "syntheticfuture",
+        underlying=underlying.upper(),
+        exchange=exchange.upper(),
+        expiry_date=expiry_date
+    )
+    return _ser(response)
 
 # MARKET DATA TOOLS
 
 @mcp.tool()
-def get_multi_quotes(symbols: list) -> str:
+@tool_safe("getting multi quotes")
+async def get_multi_quotes(symbols: list) -> str:
     """
     Get real-time quotes for multiple symbols in a single request.
 
@@ -718,16 +1073,13 @@ def get_multi_quotes(symbols: list) -> str:
         symbols: List of symbol-exchange pairs
         Example: [{"symbol": "RELIANCE", "exchange": "NSE"}, {"symbol": "INFY", "exchange": "NSE"}]
     """
-    try:
-        normalized = [{"symbol": s["symbol"].upper(), "exchange": s["exchange"].upper()} for s in symbols]
-        response = client.multiquotes(symbols=normalized)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting multi quotes: {str(e)}")
-        return f"Error getting multi quotes: {str(e)}"
+    normalized = [{"symbol": s["symbol"].upper(), "exchange": s["exchange"].upper()} for s in symbols]
+    response = await async_client.request("multiquotes", symbols=normalized)
+    return _ser(response)
 
 @mcp.tool()
-def search_instruments(query: str, exchange: str = "NSE") -> str:
+@tool_safe("searching instruments")
+async def search_instruments(query: str, exchange: str = "NSE") -> str:
     """
     Search for instruments by name or symbol.
 
@@ -735,15 +1087,12 @@ def search_instruments(query: str, exchange: str = "NSE") -> str:
         query: Search query
         exchange: Exchange to search in (NSE, BSE, NFO, etc.)
     """
-    try:
-        response = client.search(query=query, exchange=exchange.upper())
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error searching instruments: {str(e)}")
-        return f"Error searching instruments: {str(e)}"
+    response = await async_client.request("search", query=query, exchange=exchange.upper())
+    return _ser(response)
 
 @mcp.tool()
-def get_expiry_dates(symbol: str, exchange: str = "NFO", instrument_type: str = "options") -> str:
+@tool_safe("getting expiry dates")
+async def get_expiry_dates(symbol: str, exchange: str = "NFO", instrument_type: str = "options") -> str:
     """
     Get expiry dates for derivatives.
 
@@ -752,65 +1101,53 @@ def get_expiry_dates(symbol: str, exchange: str = "NFO", instrument_type: str =
         exchange: Exchange name (typically NFO for F&O)
         instrument_type: 'options' or 'futures'
     """
-    try:
-        response = client.expiry(
-            symbol=symbol.upper(),
-            exchange=exchange.upper(),
-            instrumenttype=instrument_type.lower()
-        )
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting expiry dates: {str(e)}")
-        return f"Error getting expiry dates: {str(e)}"
+    response = await async_client.request(
+        "expiry",
+        symbol=symbol.upper(),
+        exchange=exchange.upper(),
+        instrumenttype=instrument_type.lower()
+    )
+    return _ser(response)
 
 @mcp.tool()
-def get_instruments(exchange: str) -> str:
+@tool_safe("getting instruments")
+async def get_instruments(exchange: str) -> str:
     """
     Download all instruments for an exchange.
 
     Args:
         exchange: Exchange name (NSE, BSE, NFO, BFO, MCX, CDS, BCD, NCDEX)
     """
-    try:
-        response = client.instruments(exchange=exchange.upper())
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting instruments: {str(e)}")
-        return f"Error getting instruments: {str(e)}"
+    response = await asyncio.to_thread(client.instruments, exchange=exchange.upper())
+    return _ser(_cap_rows(response))
 
 # UTILITIES
 
 @mcp.tool()
-def get_holidays(year: int) -> str:
+@tool_safe("getting holidays")
+async def get_holidays(year: int) -> str:
     """
     Get trading holidays for a specific year.
 
     Args:
         year: Year to get holidays for (e.g., 2025)
     """
-    try:
-        response = client.holidays(year=year)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting holidays: {str(e)}")
-        return f"Error getting holidays: {str(e)}"
+    response = await _cached(_holidays_cache, year, lambda: async_client.request("holidays", year=year))
+    return _ser(response)
 
 @mcp.tool()
-def get_timings(date: str) -> str:
+@tool_safe("getting timings")
+async def get_timings(date: str) -> str:
     """
     Get exchange trading timings for a specific date.
 
     Args:
         date: Date in YYYY-MM-DD format (e.g., '2025-12-23')
     """
-    try:
-        response = client.timings(date=date)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting timings: {str(e)}")
-        return f"Error getting timings: {str(e)}"
+    response = await _cached(_timings_cache, date, lambda: async_client.request("timings", date=date))
+    return _ser(response)
 
-@mcp.tool()
+@_client_tool("telegram", "sending telegram alert")
 def send_telegram_alert(username: str, message: str) -> str:
     """
     Send a Telegram alert notification.
@@ -819,15 +1156,10 @@ def send_telegram_alert(username: str, message: str) -> str:
         username: OpenAlgo login ID/username
         message: Alert message to send
     """
-    try:
-        response = client.telegram(username=username, message=message)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error sending telegram alert: {str(e)}")
-        return f"Error sending telegram alert: {str(e)}"
 
 @mcp.tool()
-def calculate_margin(positions: list) -> str:
+@tool_safe("calculating margin")
+async def calculate_margin(positions: list[Position]) -> str:
     """
     Calculate margin requirements for positions.
 
@@ -835,24 +1167,19 @@ def calculate_margin(positions: list) -> str:
         positions: List of position dictionaries
         Example: [{"symbol": "NIFTY25NOV2525000CE", "exchange": "NFO", "action": "BUY", "product": "NRML", "pricetype": "MARKET", "quantity": "75"}]
     """
-    try:
-        response = client.margin(positions=positions)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error calculating margin: {str(e)}")
-        return f"Error calculating margin: {str(e)}"
-
-@mcp.tool()
+    # Margin is computed for the basket as a whole (hedge benefits included), so
+    # only identical concurrent requests can share an upstream call
+    payload = _POSITIONS.dump_python(positions, exclude_none=True)
+    key = ("margin", orjson.dumps(payload, option=orjson.OPT_SORT_KEYS))
+    response = await _single_flight(key, lambda: async_client.request("margin", positions=payload))
+    return _ser(response)
+
+@_client_tool("analyzerstatus", "getting analyzer status")
 def analyzer_status() -> str:
     """Get the current analyzer status including mode and total logs."""
-    try:
-        response = client.analyzerstatus()
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error getting analyzer status: {str(e)}")
-        return f"Error getting analyzer status: {str(e)}"
 
-@mcp.tool()
+# Analyze and live mode keep separate order books
+@_client_tool("analyzertoggle", "toggling analyzer", changes_orders=True)
 def analyzer_toggle(mode: bool) -> str:
     """
     Toggle the analyzer mode between analyze (simulated) and live trading.
@@ -860,24 +1187,22 @@ def analyzer_toggle(mode: bool) -> str:
     Args:
         mode: True for analyze mode (simulated), False for live mode
     """
-    try:
-        response = client.analyzertoggle(mode=mode)
-        return str(response)
-    except Exception as e:
-        logging.error(f"Error toggling analyzer: {str(e)}")
-        return f"Error toggling analyzer: {str(e)}"
 
 # Create a Starlette app for the SSE transport
 if MODE == 'sse':
+    # Web server imports are only needed in SSE mode
+    from starlette.applications import Starlette
     from starlette.routing import Route
+    from starlette.responses import Response
     from mcp.server.sse import SseServerTransport
+    from contextlib import asynccontextmanager
     
     # Create an SSE transport on the /messages/ endpoint
     sse = SseServerTransport("/messages/")
     
     # Define an async SSE handler that will process incoming connections
     async def handle_sse(request):
-        logging.info(f"New SSE connection from {request.client}")
+        logger.info("New SSE connection from %s", request.client)
         async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
             await mcp._mcp_server.run(
                 streams[0],
@@ -885,35 +1210,91 @@ if MODE == 'sse':
                 mcp._mcp_server.create_initialization_options(),
             )
     
+    # Liveness probes hit this often and the answer never changes, so build it once.
+    # A Response holds no per-request state, so one instance can serve every probe.
+    _HEALTH_BODY = orjson.dumps({"status": "ok", "message": "OpenAlgo MCP Server is running"})
+    _HEALTH_RESPONSE = Response(_HEALTH_BODY, media_type="application/json")
+
+    async def health_check(request):
+        return _HEALTH_RESPONSE
+
+    class _PostMessage:
+        """
+        Raw ASGI endpoint for client messages.
+
+        Route wraps plain functions and methods in a Request/Response adapter, so the
+        transport's handler is exposed through an instance to receive the ASGI call as-is.
+        """
+        async def __call__(self, scope, receive, send):
+            await sse.handle_post_message(scope, receive, send)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        _use_tool_executor()
+        logger.info("OpenAlgo MCP Server started")
+        try:
+            yield
+        finally:
+            # Drop pooled keep-alive connections to OpenAlgo before the worker exits
+            await quote_batcher.aclose()
+            client.close()
+            await async_client.aclose()
+            logger.info("OpenAlgo MCP Server shutting down")
+
     # Set up Starlette app with both SSE connection and message posting endpoints
     app = Starlette(
         debug=True,
         routes=[
             Route("/sse", endpoint=handle_sse),
-            Mount("/messages/", app=sse.handle_post_message),
+            Route("/health", endpoint=health_check),
+            # Matched directly instead of through a Mount, since every tool call posts here
+            Route("/messages/", endpoint=_PostMessage(), methods=["POST"]),
         ],
-        on_startup=[
-            lambda: logging.info("OpenAlgo MCP Server started")
-        ],
-        on_shutdown=[
-            lambda: logging.info("OpenAlgo MCP Server shutting down")
-        ]
+        lifespan=lifespan,
     )
 
 # Run the server
 if __name__ == "__main__":
-    logging.info("Starting OpenAlgo MCP Server...")
+    logger.info("Starting OpenAlgo MCP Server...")
+
+    # uvloop and httptools come with uvicorn[standard] but are optional; uvloop has no
+    # Windows build. Use them when present and fall back to asyncio/h11 otherwise.
+    from importlib.util import find_spec
+    HAS_UVLOOP = find_spec("uvloop") is not None
+    HAS_HTTPTOOLS = find_spec("httptools") is not None
     
     if MODE == 'stdio':
-        # Run in stdio mode for terminal/command line usage
-        mcp.run(transport="stdio")
+        # Run in stdio mode for terminal/command line usage. This is what mcp.run(transport="stdio")
+        # does, but on uvloop like the SSE server when it is available
+        import anyio
+
+        async def serve_stdio():
+            _use_tool_executor()
+            await mcp.run_stdio_async()
+
+        anyio.run(serve_stdio, backend_options={"use_uvloop": HAS_UVLOOP})
     else:
         # Run in SSE mode with Uvicorn for web interface
+        import uvicorn
+
+        # Uvicorn's own logging is kept to warnings outside debug mode, so announce the address here
+        logger.info("Listening on http://0.0.0.0:%s (SSE endpoint /sse)", PORT)
         uvicorn.run(
-            "server:app",
+            # Reload needs an import string to re-import the app in its child process;
+            # otherwise hand over this module's app, since importing "server:app" would run
+            # the module a second time (a second log listener, HTTP pools and tool registry)
+            "server:app" if RELOAD else app,
             host="0.0.0.0",
             port=PORT,
-            log_level="info",
-            reload=True,
-            access_log=True
+            log_level="debug" if DEBUG else "warning",
+            # A single process on purpose: the SSE transport keeps each session in the
+            # process that accepted GET /sse, and Uvicorn workers share one socket, so a
+            # client's POST /messages/ would usually reach a worker without its session
+            workers=1,
+            reload=RELOAD,
+            # The accept queue must absorb bursts of SSE connects from many clients
+            backlog=BACKLOG,
+            access_log=False,
+            loop="uvloop" if HAS_UVLOOP else "asyncio",
+            http="httptools" if HAS_HTTPTOOLS else "h11"
         )